@@ -0,0 +1,156 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+# Spoken when we shed load. Kept short so gTTS stays cheap.
+RETRY_MESSAGE = "Abhi bahut log baat kar rahe hain. Kripya thodi der baad phir se koshish karein."
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request cannot be admitted to a pipeline stage in time.
+    """
+    def __init__(self, stage: str, reason: str):
+        super().__init__(f"{stage}: {reason}")
+        self.stage = stage
+        self.reason = reason
+
+
+class StageLimiter:
+    """
+    Bounded concurrency for one pipeline stage, with a bounded wait queue.
+    """
+    def __init__(self, name: str, max_concurrency: int, max_queue: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        # Created lazily: on Python 3.9 a Semaphore binds to the loop current at construction,
+        # and this object is built at import time, before uvicorn starts its loop.
+        self._sem: Optional[asyncio.Semaphore] = None
+
+        # Stats
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._sem
+
+    @asynccontextmanager
+    async def slot(self, deadline: float):
+        """
+        Holds a slot for the duration of the block.
+        `deadline` is a time.monotonic() value shared by the whole request.
+        """
+        if self.is_full():
+            self.shed += 1
+            raise Overloaded(self.name, "queue full")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self.shed += 1
+            raise Overloaded(self.name, "deadline exceeded")
+
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=remaining)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            raise Overloaded(self.name, "deadline exceeded")
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def is_full(self) -> bool:
+        # `waiting` is bumped before the first await, so a burst is counted right away.
+        return self.waiting + self.in_flight >= self.max_concurrency + self.max_queue
+
+    def stats(self) -> Dict[str, Any]:
+        avg_wait = self.total_wait / self.admitted if self.admitted else 0.0
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "avg_wait_ms": round(avg_wait * 1000, 1),
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+class AdmissionController:
+    """
+    Admission control in front of the speech pipeline (transcription -> LLM -> TTS),
+    shared by /process-voice and /process-text.
+    Every request gets one deadline; each stage waits in its own bounded queue
+    until that deadline, and is shed with Overloaded otherwise.
+    """
+    def __init__(self):
+        max_queue = int(os.environ.get("MAX_QUEUE_DEPTH", 16))
+        self.request_timeout = float(os.environ.get("REQUEST_QUEUE_TIMEOUT", 20))
+
+        self.stages = {
+            "transcription": StageLimiter("transcription", int(os.environ.get("MAX_TRANSCRIBE_CONCURRENCY", 4)), max_queue),
+            # ServiceAgent shares one ConversationMemory, so the LLM stage defaults to serial.
+            "llm": StageLimiter("llm", int(os.environ.get("MAX_LLM_CONCURRENCY", 1)), max_queue),
+            "tts": StageLimiter("tts", int(os.environ.get("MAX_TTS_CONCURRENCY", 4)), max_queue),
+        }
+
+        self._retry_audio: Optional[str] = None
+
+    def new_deadline(self) -> float:
+        return time.monotonic() + self.request_timeout
+
+    def stage(self, name: str, deadline: float):
+        return self.stages[name].slot(deadline)
+
+    def is_saturated(self, name: str) -> bool:
+        """
+        Cheap pre-check so we can shed before doing any work (e.g. saving the upload).
+        A True result counts as a shed request.
+        """
+        limiter = self.stages[name]
+        if limiter.is_full():
+            limiter.shed += 1
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "request_timeout_s": self.request_timeout,
+            "stages": {name: limiter.stats() for name, limiter in self.stages.items()},
+        }
+
+    async def warm_retry_audio(self, synthesize):
+        """
+        Synthesizes the spoken "please retry" message once (run as a background task at startup).
+        A failure is cached as "" so shedding never waits on gTTS.
+        """
+        self._retry_audio = await asyncio.to_thread(synthesize, RETRY_MESSAGE) or ""
+
+    def retry_audio(self) -> str:
+        """
+        Cached retry audio ("" if not synthesized or synthesis failed).
+        """
+        return self._retry_audio or ""
@@ -3,7 +3,7 @@ import os
 from typing import List, Dict, Any
 import google.generativeai as genai
 from google.api_core import retry
-from tools import search_schemes, check_eligibility
+from tools import search_schemes, check_eligibility, prefetch_searches, predict_queries, normalize_query
 from memory import ConversationMemory
 
 # Configure Gemini
@@ -37,6 +37,9 @@ class ServiceAgent:
             safety_settings=self.safety_settings
         )
 
+        # If set, prefetched search_schemes results are sent with Turn 1 so the model can skip the tool round trip
+        self.prefetch_grounding = os.environ.get("PREFETCH_GROUNDING", "").lower() in ["1", "true", "yes"]
+
     def run(self, user_input: str) -> Dict[str, Any]:
         """
         Executes the agent loop using stateless generate_content.
@@ -87,6 +90,22 @@ class ServiceAgent:
             # Or a simple while loop
             
             current_history = gemini_history[:]
+
+            # With grounding on, likely search_schemes results are fetched up front and sent with Turn 1.
+            # Otherwise only the predicted queries are computed (no searches), to log prefetch accuracy.
+            prefetched = {}
+
+            if self.prefetch_grounding:
+                prefetched = prefetch_searches(user_input)
+                if prefetched and current_history:
+                    current_history[-1] = {
+                        "role": "user",
+                        "parts": current_history[-1]["parts"] + [
+                            "Context (search_schemes results already fetched, use these instead of calling the tool for the same query): "
+                            + json.dumps(prefetched, ensure_ascii=False)
+                        ]
+                    }
+                    trace_logs.append(f"Grounding: Prefetched {list(prefetched.keys())}")
             
             # Turn 1: Send History
             try:
@@ -136,7 +155,17 @@ class ServiceAgent:
                     
                     # Execute
                     if func_name == "search_schemes":
-                        res = search_schemes(args.get("query", ""))
+                        query = args.get("query", "")
+                        key = normalize_query(query)
+                        predicted = list(prefetched.keys()) if self.prefetch_grounding else predict_queries(user_input)
+                        if key in prefetched:
+                            res = prefetched[key]
+                        else:
+                            res = search_schemes(query)
+                        if key in predicted:
+                            trace_logs.append(f"Prefetch: Hit ({key})")
+                        else:
+                            trace_logs.append(f"Prefetch: Miss ({key}, predicted {predicted})")
                     elif func_name == "check_eligibility":
                         res = check_eligibility(args.get("scheme_id"), args.get("user_attributes", {}))
                     else:
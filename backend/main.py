@@ -1,5 +1,7 @@
 import os
 import shutil
+import tempfile
+import asyncio
 from dotenv import load_dotenv
 
 # Load env vars FIRST, before importing modules that rely on them
@@ -17,6 +19,7 @@ class TextInput(BaseModel):
 
 from agent import ServiceAgent
 from speech_services import transcribe_audio, synthesize_speech
+from admission import AdmissionController, Overloaded, RETRY_MESSAGE
 
 print(f"[Main] GEMINI_API_KEY present: {'GEMINI_API_KEY' in os.environ}")
 if 'GEMINI_API_KEY' in os.environ:
@@ -40,6 +43,44 @@ app.add_middleware(
 # Global agent
 agent = ServiceAgent()
 
+# Admission control for the voice pipeline
+admission = AdmissionController()
+
+@app.on_event("startup")
+async def warm_retry_audio():
+    # In the background: gTTS has no timeout, so awaiting it here could hang startup.
+    # Until it finishes, shed responses go out without audio.
+    app.state.warm_retry_audio = asyncio.create_task(admission.warm_retry_audio(synthesize_speech))
+
+def overloaded_response(reason: str):
+    """
+    Fast 429 with the cached spoken "please retry" message.
+    """
+    print(f"[Main] Shedding request: {reason}")
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": "5"},
+        content={
+            "user_text": "",
+            "agent_text": RETRY_MESSAGE,
+            "agent_audio": admission.retry_audio(),
+            "trace": [f"Overloaded: {reason}"]
+        }
+    )
+
+async def synthesize_reply(agent_text: str, deadline: float, trace: list) -> str:
+    """
+    TTS for a reply whose upstream work is already done. Never sheds the request:
+    if TTS is overloaded, the text is returned without audio.
+    """
+    try:
+        async with admission.stage("tts", deadline):
+            return await asyncio.to_thread(synthesize_speech, agent_text)
+    except Overloaded as e:
+        print(f"[Main] Skipping TTS: {e}")
+        trace.append(f"TTS skipped: {e}")
+        return ""
+
 # -------------------- ERROR HANDLERS --------------------
 
 @app.exception_handler(Exception)
@@ -60,6 +101,10 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 def read_root():
     return {"status": "Service Agent Online"}
 
+@app.get("/load")
+def load_stats():
+    return admission.stats()
+
 @app.post("/reset")
 def reset_memory():
     agent.memory.clear()
@@ -79,13 +124,16 @@ async def process_text(input: TextInput):
                 "trace": ["Empty text received"]
             }
 
+        deadline = admission.new_deadline()
+
         # Agent reasoning
-        agent_result = agent.run(user_text)
+        async with admission.stage("llm", deadline):
+            agent_result = await asyncio.to_thread(agent.run, user_text)
         agent_text = agent_result["response"]
         trace = agent_result["trace"]
 
         # TTS
-        audio_base64 = synthesize_speech(agent_text)
+        audio_base64 = await synthesize_reply(agent_text, deadline, trace)
 
         return {
             "user_text": user_text,
@@ -94,23 +142,31 @@ async def process_text(input: TextInput):
             "trace": trace
         }
 
+    except Overloaded as e:
+        return overloaded_response(str(e))
+
     except Exception as e:
         print("PROCESS TEXT ERROR:", e)
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 @app.post("/process-voice")
 async def process_voice(file: UploadFile = File(...)):
+    # 0. Shed before touching disk if transcription is already backed up
+    if admission.is_saturated("transcription"):
+        return overloaded_response("transcription: queue full")
+
+    deadline = admission.new_deadline()
+    temp_filename = None
     try:
-        # 1. Save audio
-        temp_filename = f"temp_{file.filename}"
-        with open(temp_filename, "wb") as buffer:
+        # 1. Save audio (unique path per request; requests now run concurrently)
+        with tempfile.NamedTemporaryFile(delete=False, prefix="temp_", suffix=".webm") as buffer:
+            temp_filename = buffer.name
             shutil.copyfileobj(file.file, buffer)
 
         file_size = os.path.getsize(temp_filename)
         print(f"[Main] Audio saved: {temp_filename} ({file_size} bytes)")
 
         if file_size < 100:
-            os.remove(temp_filename)
             return {
                 "user_text": "",
                 "agent_text": "I didn't hear anything. Please try again.",
@@ -120,34 +176,36 @@ async def process_voice(file: UploadFile = File(...)):
 
         # 2. Transcribe
         print(f"[Main] Transcribing file: {temp_filename}...")
-        user_text = transcribe_audio(temp_filename)
+        async with admission.stage("transcription", deadline):
+            user_text = await asyncio.to_thread(transcribe_audio, temp_filename, None, deadline)
         print(f"[Main] Transcription Result: '{user_text}'")
         
         if not user_text or user_text.strip() == "" or "NO_SPEECH" in user_text:
              print("[Main] No valid speech detected in transcription.")
-             os.remove(temp_filename)
              agent_txt = "I heard something, but I couldn't understand the words. Can you try again?"
+             trace = ["Gemini detected no speech."]
+             agent_audio = await synthesize_reply(agent_txt, deadline, trace) # Synthesize the error!
              return {
                 "user_text": "",
                 "agent_text": agent_txt,
-                "agent_audio": synthesize_speech(agent_txt), # Synthesize the error!
-                "trace": ["Gemini detected no speech."]
+                "agent_audio": agent_audio,
+                "trace": trace
             }
         
+        if user_text == "ERROR: RATE_LIMITED":
+            return overloaded_response("transcription: rate limited")
+
         if user_text.startswith("ERROR"):
-            # Clean up
-            os.remove(temp_filename)
             return JSONResponse(status_code=500, content={"error": "Transcription failed"})
 
         # 3. Agent reasoning
-        agent_result = agent.run(user_text)
+        async with admission.stage("llm", deadline):
+            agent_result = await asyncio.to_thread(agent.run, user_text)
         agent_text = agent_result["response"]
         trace = agent_result["trace"]
 
         # 4. TTS
-        audio_base64 = synthesize_speech(agent_text)
-
-        os.remove(temp_filename)
+        audio_base64 = await synthesize_reply(agent_text, deadline, trace)
 
         return {
             "user_text": user_text,
@@ -156,10 +214,17 @@ async def process_voice(file: UploadFile = File(...)):
             "trace": trace
         }
 
+    except Overloaded as e:
+        return overloaded_response(str(e))
+
     except Exception as e:
         print("PROCESS VOICE ERROR:", e)
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+    finally:
+        if temp_filename and os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
 # -------------------- RUN --------------------
 
 if __name__ == "__main__":
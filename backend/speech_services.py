@@ -10,9 +10,11 @@ from io import BytesIO
 if "GEMINI_API_KEY" in os.environ:
     genai.configure(api_key=os.environ["GEMINI_API_KEY"])
 
-def transcribe_audio(file_path: str, language: str = None) -> str:
+def transcribe_audio(file_path: str, language: str = None, deadline: float = None) -> str:
     """
     Transcribes audio using Gemini 1.5 Flash.
+    If `deadline` (a time.monotonic() value) is given, rate-limit retries stop
+    once the next wait would overrun it, and 'ERROR: RATE_LIMITED' is returned.
     """
     print(f"[Speech] Transcribing {file_path} using Gemini...")
     try:
@@ -55,6 +57,9 @@ def transcribe_audio(file_path: str, language: str = None) -> str:
 
             except exceptions.ResourceExhausted:
                 wait_time = (attempt + 1) * 5
+                if deadline is not None and time.monotonic() + wait_time > deadline:
+                    print("[Speech] Rate limit hit. Retry would overrun the request deadline, giving up.")
+                    return "ERROR: RATE_LIMITED"
                 print(f"[Speech] Rate limit hit. Retrying in {wait_time}s...")
                 time.sleep(wait_time)
             except Exception as e: 
@@ -63,6 +63,44 @@ def search_schemes(query: str) -> List[Dict[str, Any]]:
             
     return unique_results
 
+# Transcript words (Hindi / Hinglish) -> the English keywords the model usually passes to search_schemes
+QUERY_ALIASES = {
+    "farmer": ["farmer", "kisan", "किसान", "kheti", "खेती"],
+    "health": ["health", "hospital", "swasthya", "स्वास्थ्य", "ilaj", "इलाज", "अस्पताल"],
+    "girl": ["girl", "daughter", "beti", "बेटी", "ladki", "लड़की"],
+}
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def predict_queries(text: str) -> List[str]:
+    """
+    Normalized search_schemes queries the model is likely to ask for, based on the
+    raw user transcript. Does not run any search.
+    """
+    text_lower = text.lower()
+    queries = []
+    for keyword, aliases in QUERY_ALIASES.items():
+        if any(alias in text_lower for alias in aliases):
+            queries.append(keyword)
+    for scheme in SCHEMES_DB:
+        if scheme["name"].lower() in text_lower or scheme["id"] in text_lower:
+            queries.append(scheme["name"])
+
+    predicted = []
+    for q in queries:
+        key = normalize_query(q)
+        if key not in predicted:
+            predicted.append(key)
+    return predicted
+
+def prefetch_searches(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Speculatively runs search_schemes for the predicted queries.
+    Returns results keyed by normalized query.
+    """
+    return {key: search_schemes(key) for key in predict_queries(text)}
+
 def check_eligibility(scheme_id: str, user_attributes: Dict[str, Any]) -> Dict[str, Any]:
     """
     Checks if a user is eligible for a specific scheme based on provided attributes.
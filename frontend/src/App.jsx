@@ -105,7 +105,8 @@ function App() {
         body: JSON.stringify({ text: text }),
       });
 
-      if (!response.ok) throw new Error("API Failure");
+      // 429 = server overloaded; its body carries a spoken "please retry" message
+      if (!response.ok && response.status !== 429) throw new Error("API Failure");
 
       const data = await response.json();
 